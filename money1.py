@@ -8,14 +8,20 @@
 # - บันทึกยอดออมจริง (manual deposit) + progress bar ต่อรายเป้าหมาย
 # - Snooze/เตือน (บันทึก reminder และแจ้งเตือนในแอปเมื่อครบกำหนด)
 # - จัดลำดับความสำคัญด้วย priority_score และ badge Cheap/Moderate/Expensive
-# - ส่งออก CSV (goals, savings)
+# - ส่งออก CSV (goals, savings) เลือกช่วงวันที่ได้
+# - สำรองข้อมูล (DB + รูป) แบบ online เป็น snapshot .tar.gz หมุนเวียน + กู้คืน
 # -------------------------------------------------------------
 
 import os
 import io
 import math
+import shutil
 import sqlite3
-from datetime import datetime, date, timedelta
+import tarfile
+import tempfile
+import threading
+import time
+from datetime import datetime, date, timedelta, timezone
 from typing import Optional, Dict, Any, List
 
 import pandas as pd
@@ -28,21 +34,112 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 DB_PATH = os.path.join(DATA_DIR, "savesmart.db")
+BACKUP_DIR = os.path.join(DATA_DIR, "backups")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(BACKUP_DIR, exist_ok=True)
 
 APP_TITLE = "SaveSmart – ชั่วโมงงานแลกของที่อยากได้"
 CURRENCY_DEFAULT = "THB"
 
+BACKUP_KEEP = 7               # จำนวน snapshot ล่าสุดที่เก็บไว้ (เก่ากว่านี้ลบทิ้ง)
+BACKUP_PAGES_PER_STEP = 64    # คัดลอกทีละกี่ page ต่อรอบ เพื่อไม่ล็อก DB นาน
+BACKUP_STEP_PAUSE = 0.005     # พักระหว่างรอบ (วินาที) ให้ session อื่นเขียน DB ได้
+SNAPSHOT_DB_NAME = "savesmart.db"
+
+# -----------------------------
+# SCHEMA
+# -----------------------------
+# v1: คอลัมน์เวลาเก็บเป็นวินาที epoch (UTC) แบบ INTEGER แทน ISO TEXT
+SCHEMA_VERSION = 1
+
+TABLES = {
+    # โปรไฟล์ผู้ใช้ (MVP ใช้ผู้ใช้เดียว id = 1)
+    "users": """
+        id INTEGER PRIMARY KEY,
+        username TEXT,
+        currency TEXT,
+        income_amount REAL,
+        income_period TEXT,   -- daily/weekly/monthly/yearly
+        hours_per_day REAL,
+        work_days_per_week REAL,
+        work_days_per_month REAL,
+        fixed_expenses REAL,
+        created_at INTEGER    -- epoch seconds (UTC)
+    """,
+    "goals": """
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER,
+        title TEXT,
+        price REAL,
+        emoji TEXT,
+        image_path TEXT,
+        category TEXT,
+        necessity INTEGER,          -- 1..5
+        created_at INTEGER,         -- epoch seconds (UTC)
+        target_date INTEGER,        -- epoch seconds ของเที่ยงคืน UTC
+        status TEXT DEFAULT 'active' -- active, snoozed, achieved, deleted
+    """,
+    "savings": """
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER,
+        goal_id INTEGER,
+        amount REAL,
+        note TEXT,
+        ts INTEGER            -- epoch seconds (UTC)
+    """,
+    "reminders": """
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER,
+        goal_id INTEGER,
+        remind_at INTEGER,    -- epoch seconds (UTC)
+        recurring TEXT,       -- none/daily/weekly/monthly
+        enabled INTEGER
+    """,
+}
+
+# index สำหรับ query ช่วงเวลา (reminder ที่ถึงกำหนด, ประวัติการออม, export)
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_goals_user_created ON goals (user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_goals_user_target ON goals (user_id, target_date)",
+    "CREATE INDEX IF NOT EXISTS idx_savings_user_ts ON savings (user_id, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_savings_goal_ts ON savings (goal_id, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (user_id, enabled, remind_at)",
+]
+
+TIME_COLUMNS = {"created_at", "target_date", "ts", "remind_at"}
+DATE_COLUMNS = {"target_date"}
+
 # -----------------------------
 # DB UTILITIES
 # -----------------------------
 
+def to_epoch(value) -> Optional[int]:
+    """แปลง datetime (UTC แบบ naive เหมือน utcnow) หรือ date เป็นวินาที epoch"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
+def from_epoch(ts: Optional[int], as_date: bool = False):
+    if ts is None:
+        return None
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+    return dt.date() if as_date else dt
+
+
 def dict_factory(cursor, row):
     d = {}
     for idx, col in enumerate(cursor.description):
-        d[col[0]] = row[idx]
+        name = col[0]
+        val = row[idx]
+        # คอลัมน์เวลาเก็บเป็น epoch INTEGER แต่คืนค่าเป็น date/datetime ให้ผู้เรียก
+        if name in TIME_COLUMNS and isinstance(val, int):
+            val = from_epoch(val, as_date=name in DATE_COLUMNS)
+        d[name] = val
     return d
 
 
@@ -56,67 +153,13 @@ def init_db():
     conn = get_conn()
     cur = conn.cursor()
 
-    # โปรไฟล์ผู้ใช้ (MVP ใช้ผู้ใช้เดียว id = 1)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            username TEXT,
-            currency TEXT,
-            income_amount REAL,
-            income_period TEXT,   -- daily/weekly/monthly/yearly
-            hours_per_day REAL,
-            work_days_per_week REAL,
-            work_days_per_month REAL,
-            fixed_expenses REAL,
-            created_at TEXT
-        )
-        """
-    )
-
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS goals (
-            id INTEGER PRIMARY KEY,
-            user_id INTEGER,
-            title TEXT,
-            price REAL,
-            emoji TEXT,
-            image_path TEXT,
-            category TEXT,
-            necessity INTEGER,          -- 1..5
-            created_at TEXT,
-            target_date TEXT,
-            status TEXT DEFAULT 'active' -- active, snoozed, achieved, deleted
-        )
-        """
-    )
+    for name, columns in TABLES.items():
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns})")
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS savings (
-            id INTEGER PRIMARY KEY,
-            user_id INTEGER,
-            goal_id INTEGER,
-            amount REAL,
-            note TEXT,
-            ts TEXT
-        )
-        """
-    )
+    migrate_db(conn)
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS reminders (
-            id INTEGER PRIMARY KEY,
-            user_id INTEGER,
-            goal_id INTEGER,
-            remind_at TEXT,
-            recurring TEXT,   -- none/daily/weekly/monthly
-            enabled INTEGER
-        )
-        """
-    )
+    for ddl in INDEXES:
+        cur.execute(ddl)
 
     # สร้างโปรไฟล์ default หากยังไม่มี
     cur.execute("SELECT COUNT(*) AS c FROM users")
@@ -126,13 +169,67 @@ def init_db():
             INSERT INTO users (id, username, currency, income_amount, income_period, hours_per_day, work_days_per_week, work_days_per_month, fixed_expenses, created_at)
             VALUES (1, 'you', ?, 10005.0, 'monthly', 10.0, 5.0, 22.0, 0.0, ?)
             """,
-            (CURRENCY_DEFAULT, datetime.utcnow().isoformat()),
+            (CURRENCY_DEFAULT, to_epoch(datetime.utcnow())),
         )
 
     conn.commit()
     conn.close()
 
 
+def migrate_db(conn):
+    """ย้ายคอลัมน์เวลาแบบ ISO TEXT (schema เดิม) ไปเป็น epoch INTEGER
+
+    แปลงทั้งตารางด้วย SQL ครั้งเดียว (สร้างตารางใหม่ → INSERT ... SELECT → rename)
+    ไม่ต้อง parse ทีละแถวใน Python ทั้งหมดอยู่ใน transaction เดียว ถ้าหยุดกลางทาง
+    จะ rollback กลับเป็น schema เดิม
+    """
+    cur = conn.cursor()
+    cur.execute("PRAGMA user_version")
+    if cur.fetchone()["user_version"] >= SCHEMA_VERSION:
+        return
+
+    # ล็อกก่อนแล้วอ่าน version ซ้ำ กัน session อื่น migrate ซ้อนกัน
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("PRAGMA user_version")
+        if cur.fetchone()["user_version"] >= SCHEMA_VERSION:
+            conn.rollback()
+            return
+
+        for name, columns in TABLES.items():
+            cur.execute(f"PRAGMA table_info({name})")
+            info = cur.fetchall()
+            col_types = {c["name"]: (c["type"] or "").upper() for c in info}
+            time_cols = [c for c in TIME_COLUMNS if col_types.get(c) == "TEXT"]
+            if not time_cols:
+                continue
+            names = [c["name"] for c in info]
+            select = ", ".join(
+                f"CAST(strftime('%s', {c}) AS INTEGER)" if c in time_cols else c
+                for c in names
+            )
+            cur.execute(f"DROP TABLE IF EXISTS {name}__new")
+            cur.execute(f"CREATE TABLE {name}__new ({columns})")
+            cur.execute(f"INSERT INTO {name}__new ({', '.join(names)}) SELECT {select} FROM {name}")
+
+            # ค่าที่ strftime แปลงไม่ได้จะกลายเป็น NULL → เก็บตารางเดิมไว้กู้คืน
+            lost = " OR ".join(f"(o.{c} IS NOT NULL AND n.{c} IS NULL)" for c in time_cols)
+            cur.execute(
+                f"SELECT COUNT(*) AS c FROM {name} o JOIN {name}__new n ON o.id = n.id WHERE {lost}"
+            )
+            if cur.fetchone()["c"]:
+                cur.execute(f"ALTER TABLE {name} RENAME TO {name}__legacy")
+            else:
+                cur.execute(f"DROP TABLE {name}")
+            cur.execute(f"ALTER TABLE {name}__new RENAME TO {name}")
+
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
 # -----------------------------
 # PROFILE / CALC FUNCTIONS
 # -----------------------------
@@ -272,8 +369,8 @@ def add_goal(user_id: int, title: str, price: float, emoji: str, image_path: str
         """,
         (
             user_id, title, float(price or 0), (emoji or ""), (image_path or ""),
-            (category or "Other"), int(necessity or 1), datetime.utcnow().isoformat(),
-            target_date.isoformat() if target_date else None,
+            (category or "Other"), int(necessity or 1), to_epoch(datetime.utcnow()),
+            to_epoch(target_date),
         ),
     )
     conn.commit()
@@ -318,18 +415,49 @@ def add_saving(user_id: int, goal_id: int, amount: float, note: str = ""):
     cur = conn.cursor()
     cur.execute(
         "INSERT INTO savings (user_id, goal_id, amount, note, ts) VALUES (?, ?, ?, ?, ?)",
-        (user_id, goal_id, float(amount or 0), note or "", datetime.utcnow().isoformat()),
+        (user_id, goal_id, float(amount or 0), note or "", to_epoch(datetime.utcnow())),
     )
     conn.commit()
     conn.close()
 
 
+def time_range_clause(column: str, start: Optional[date] = None, end: Optional[date] = None):
+    """สร้างเงื่อนไขช่วงเวลา [start, end] บนคอลัมน์ epoch เพื่อให้ใช้ index ได้ตรง ๆ"""
+    clauses = []
+    params = []
+    if start:
+        clauses.append(f"{column} >= ?")
+        params.append(to_epoch(start))
+    if end:
+        # end เป็นวันที่แบบรวมทั้งวัน → ใช้ < เที่ยงคืนของวันถัดไป
+        clauses.append(f"{column} < ?")
+        params.append(to_epoch(end + timedelta(days=1)))
+    return "".join(f" AND {c}" for c in clauses), tuple(params)
+
+
+def savings_history(user_id: int, goal_id: Optional[int] = None,
+                    start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+    where, params = time_range_clause("ts", start, end)
+    if goal_id is not None:
+        query = f"SELECT * FROM savings WHERE user_id = ? AND goal_id = ?{where} ORDER BY ts"
+        params = (user_id, goal_id) + params
+    else:
+        query = f"SELECT * FROM savings WHERE user_id = ?{where} ORDER BY ts"
+        params = (user_id,) + params
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
 def set_reminder(user_id: int, goal_id: int, remind_at: datetime, recurring: str = "none", enabled: int = 1):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
         "INSERT INTO reminders (user_id, goal_id, remind_at, recurring, enabled) VALUES (?, ?, ?, ?, ?)",
-        (user_id, goal_id, remind_at.isoformat(), recurring, int(enabled)),
+        (user_id, goal_id, to_epoch(remind_at), recurring, int(enabled)),
     )
     conn.commit()
     conn.close()
@@ -338,22 +466,21 @@ def set_reminder(user_id: int, goal_id: int, remind_at: datetime, recurring: str
 def snooze_reminder(reminder_id: int, delta_days: int):
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("SELECT * FROM reminders WHERE id = ?", (reminder_id,))
-    r = cur.fetchone()
-    if r:
-        new_time = datetime.fromisoformat(r["remind_at"]) + timedelta(days=delta_days)
-        cur.execute("UPDATE reminders SET remind_at = ?, enabled = 1 WHERE id = ?", (new_time.isoformat(), reminder_id))
-        conn.commit()
+    cur.execute(
+        "UPDATE reminders SET remind_at = remind_at + ?, enabled = 1 WHERE id = ?",
+        (int(delta_days) * 86400, reminder_id),
+    )
+    conn.commit()
     conn.close()
 
 
 def due_reminders(user_id: int) -> List[Dict[str, Any]]:
-    now_iso = datetime.utcnow().isoformat()
+    now_ts = to_epoch(datetime.utcnow())
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
         "SELECT r.*, g.title AS goal_title FROM reminders r JOIN goals g ON r.goal_id = g.id WHERE r.user_id = ? AND r.enabled = 1 AND r.remind_at <= ?",
-        (user_id, now_iso),
+        (user_id, now_ts),
     )
     rows = cur.fetchall()
     conn.close()
@@ -389,6 +516,215 @@ def export_table_csv(query: str, params: tuple = ()) -> bytes:
     return df.to_csv(index=False).encode("utf-8-sig")
 
 
+# -----------------------------
+# BACKUP / RESTORE
+# -----------------------------
+
+def backup_db(dest_path: str, progress=None):
+    """คัดลอก DB แบบ online ด้วย SQLite backup API ทีละ BACKUP_PAGES_PER_STEP page
+
+    ได้ snapshot ณ จุดเวลาเดียวที่สอดคล้องกัน โดยไม่บล็อกการใช้งานระหว่างคัดลอก
+    """
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        time.sleep(BACKUP_STEP_PAUSE)
+
+    src = sqlite3.connect(DB_PATH)
+    dst = sqlite3.connect(dest_path)
+    try:
+        src.backup(dst, pages=BACKUP_PAGES_PER_STEP, progress=on_step)
+    finally:
+        dst.close()
+        src.close()
+
+
+def verify_db(path: str) -> bool:
+    """ตรวจ integrity และต้องมีตารางของแอปครบ (ไฟล์ว่างผ่าน integrity_check ได้)"""
+    conn = sqlite3.connect(path)
+    try:
+        if conn.execute("PRAGMA integrity_check").fetchone()[0] != "ok":
+            return False
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return set(TABLES) <= tables
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conn.close()
+
+
+def list_snapshots() -> List[Dict[str, Any]]:
+    rows = []
+    for fname in os.listdir(BACKUP_DIR):
+        if not (fname.startswith("savesmart-") and fname.endswith(".tar.gz")):
+            continue
+        path = os.path.join(BACKUP_DIR, fname)
+        rows.append({
+            "name": fname,
+            "path": path,
+            "size": os.path.getsize(path),
+            "created_at": from_epoch(int(os.path.getmtime(path))),
+        })
+    # ชื่อไฟล์มี timestamp → เรียงตามชื่อคือใหม่→เก่า
+    rows.sort(key=lambda x: x["name"], reverse=True)
+    return rows
+
+
+def rotate_snapshots(keep: int = BACKUP_KEEP):
+    for snap in list_snapshots()[keep:]:
+        os.remove(snap["path"])
+
+
+def create_snapshot(progress=None, verify: bool = True, rotate: bool = True) -> str:
+    """สำรอง DB + รูปที่อัปโหลดเป็นไฟล์ .tar.gz ใน BACKUP_DIR แล้วหมุนเวียนไฟล์เก่า
+
+    verify=False ใช้ตอนสำรองก่อนกู้คืน: เก็บ DB ปัจจุบันไว้เสมอแม้จะเสียหาย
+    """
+    # ระบุถึงไมโครวินาที กันสองงานที่เสร็จในวินาทีเดียวกันทับไฟล์กัน
+    stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(BACKUP_DIR, f"savesmart-{stamp}.tar.gz")
+    if os.path.exists(path):
+        raise FileExistsError(f"มี snapshot ชื่อนี้อยู่แล้ว: {path}")
+    tmp_db = os.path.join(BACKUP_DIR, f".{stamp}.db")
+    tmp_archive = path + ".partial"
+    try:
+        backup_db(tmp_db, progress)
+        if verify and not verify_db(tmp_db):
+            raise RuntimeError("ตรวจสอบ snapshot ไม่ผ่าน (integrity_check หรือตารางไม่ครบ)")
+        with tarfile.open(tmp_archive, "w:gz") as tar:
+            tar.add(tmp_db, arcname=SNAPSHOT_DB_NAME)
+            for fname in sorted(os.listdir(UPLOAD_DIR)):
+                fpath = os.path.join(UPLOAD_DIR, fname)
+                if os.path.isfile(fpath):
+                    tar.add(fpath, arcname=f"uploads/{fname}")
+        # เขียนไฟล์ให้เสร็จก่อนค่อย rename → ไม่มี snapshot ที่เขียนไม่ครบ
+        os.replace(tmp_archive, path)
+    finally:
+        for p in (tmp_db, tmp_archive):
+            if os.path.exists(p):
+                os.remove(p)
+    if rotate:
+        rotate_snapshots()
+    return path
+
+
+def extract_snapshot_db(path: str, dest_path: str):
+    with tarfile.open(path, "r:gz") as tar:
+        with tar.extractfile(SNAPSHOT_DB_NAME) as fsrc, open(dest_path, "wb") as fdst:
+            shutil.copyfileobj(fsrc, fdst)
+
+
+def verify_snapshot(path: str) -> bool:
+    with tempfile.TemporaryDirectory(dir=BACKUP_DIR) as tmp:
+        tmp_db = os.path.join(tmp, SNAPSHOT_DB_NAME)
+        try:
+            extract_snapshot_db(path, tmp_db)
+        except (tarfile.TarError, KeyError, OSError, EOFError):
+            return False
+        return verify_db(tmp_db)
+
+
+def restore_snapshot(path: str) -> Dict[str, Any]:
+    """กู้คืน DB จาก snapshot (ตรวจก่อนเขียนทับ) และคืนรูปที่หายไป
+
+    ก่อนเขียนทับจะสำรอง DB ปัจจุบันเป็น snapshot ใหม่ไว้ เผื่อกู้คืนผิดอัน
+    คืนค่า {"images": จำนวนรูปที่กู้คืน, "pre_restore": path ของ snapshot ก่อนกู้คืน}
+    """
+    with tempfile.TemporaryDirectory(dir=BACKUP_DIR) as tmp:
+        tmp_db = os.path.join(tmp, SNAPSHOT_DB_NAME)
+        try:
+            extract_snapshot_db(path, tmp_db)
+        except (tarfile.TarError, KeyError, OSError, EOFError) as e:
+            # ไฟล์ถูกตัด/เสีย: แจ้งเป็น error เดียวกับกรณีตรวจไม่ผ่าน
+            raise ValueError(f"snapshot เสียหาย (อ่านไฟล์ไม่ได้: {e})") from e
+        if not verify_db(tmp_db):
+            raise ValueError("snapshot เสียหาย (integrity_check ไม่ผ่านหรือตารางไม่ครบ)")
+
+        # ยังไม่หมุนเวียนตอนนี้ ไม่งั้นอาจลบ snapshot ที่กำลังจะกู้คืนทิ้ง
+        pre_restore = create_snapshot(verify=False, rotate=False)
+
+        # คืนรูปก่อนเขียนทับ DB: ถ้าล้มเหลวตรงนี้ DB ปัจจุบันยังไม่ถูกแตะ
+        # (เพิ่มเฉพาะไฟล์ที่หายไป จึงไม่กระทบข้อมูลเดิม)
+        restored = 0
+        try:
+            with tarfile.open(path, "r:gz") as tar:
+                for member in tar:
+                    if not (member.isfile() and member.name.startswith("uploads/")):
+                        continue
+                    dest = os.path.join(UPLOAD_DIR, os.path.basename(member.name))
+                    if os.path.exists(dest):
+                        continue
+                    with tar.extractfile(member) as fsrc, open(dest, "wb") as fdst:
+                        shutil.copyfileobj(fsrc, fdst)
+                    restored += 1
+        except (tarfile.TarError, EOFError) as e:
+            raise ValueError(f"snapshot เสียหาย (อ่านรูปไม่ได้: {e})") from e
+
+        # เขียนทับ DB ปัจจุบันด้วย backup API รอบเดียว (ทั้งไฟล์ใน transaction เดียว)
+        src = sqlite3.connect(tmp_db)
+        dst = sqlite3.connect(DB_PATH)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+    try:
+        # snapshot ที่สร้างก่อนเปลี่ยน schema จะถูก migrate ที่นี่
+        init_db()
+        rotate_snapshots()
+    except (sqlite3.Error, OSError) as e:
+        raise RuntimeError(
+            f"กู้คืน DB แล้วแต่ขั้นตอนหลังกู้คืนล้มเหลว ({e}) — "
+            f"ข้อมูลก่อนกู้คืนอยู่ใน {os.path.basename(pre_restore)}"
+        ) from e
+    return {"images": restored, "pre_restore": pre_restore}
+
+
+class BackupWorker:
+    """รัน create_snapshot ใน background thread (ครั้งละงานเดียว) และเก็บสถานะไว้ให้ UI อ่าน"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.status = {"running": False, "copied": 0, "total": 0, "last_path": None, "error": None}
+
+    def start(self) -> bool:
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return False
+            self.status.update(running=True, copied=0, total=0, error=None)
+            self.thread = threading.Thread(target=self.run, name="savesmart-backup", daemon=True)
+            self.thread.start()
+        return True
+
+    def on_progress(self, copied: int, total: int):
+        with self.lock:
+            self.status.update(copied=copied, total=total)
+
+    def run(self):
+        try:
+            path = create_snapshot(progress=self.on_progress)
+            with self.lock:
+                self.status.update(last_path=path)
+        except Exception as e:
+            with self.lock:
+                self.status.update(error=str(e))
+        finally:
+            with self.lock:
+                self.status.update(running=False)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.status)
+
+
+@st.cache_resource
+def get_backup_worker() -> BackupWorker:
+    # ใช้ร่วมกันทุก session เพื่อไม่ให้สำรองข้อมูลซ้อนกัน
+    return BackupWorker()
+
+
 # -----------------------------
 # STREAMLIT UI
 # -----------------------------
@@ -457,11 +793,64 @@ with st.sidebar:
 
     st.markdown("---")
     st.subheader("นำออกข้อมูล (CSV)")
-    goals_csv = export_table_csv("SELECT * FROM goals WHERE status != 'deleted' AND user_id = ?", (USER_ID,))
+    export_range = st.date_input("ช่วงวันที่ (optional)", value=(), format="YYYY-MM-DD")
+    ex_start, ex_end = (export_range if len(export_range) == 2 else (None, None))
+    goals_where, goals_params = time_range_clause("created_at", ex_start, ex_end)
+    goals_csv = export_table_csv(f"SELECT * FROM goals WHERE user_id = ? AND status != 'deleted'{goals_where} ORDER BY created_at", (USER_ID,) + goals_params)
     st.download_button("Export Goals CSV", data=goals_csv, file_name="goals.csv", mime="text/csv")
-    savings_csv = export_table_csv("SELECT * FROM savings WHERE user_id = ?", (USER_ID,))
+    savings_where, savings_params = time_range_clause("ts", ex_start, ex_end)
+    savings_csv = export_table_csv(f"SELECT * FROM savings WHERE user_id = ?{savings_where} ORDER BY ts", (USER_ID,) + savings_params)
     st.download_button("Export Savings CSV", data=savings_csv, file_name="savings.csv", mime="text/csv")
 
+    st.markdown("---")
+    st.subheader("สำรองข้อมูล (Backup)")
+    # ข้อความจากการกู้คืนรอบก่อน (st.rerun จะล้างสิ่งที่ render ไว้)
+    restore_notice = st.session_state.pop("restore_notice", None)
+    if restore_notice:
+        st.success(restore_notice)
+    backup_worker = get_backup_worker()
+    backup_status = backup_worker.get_status()
+    if st.button("สำรองข้อมูลตอนนี้", disabled=backup_status["running"]):
+        backup_worker.start()
+        st.rerun()
+    if backup_status["running"]:
+        frac = backup_status["copied"] / backup_status["total"] if backup_status["total"] else 0.0
+        st.progress(frac, text=f"กำลังสำรอง… {backup_status['copied']}/{backup_status['total']} pages")
+        if st.button("รีเฟรชสถานะ"):
+            st.rerun()
+    elif backup_status["error"]:
+        st.error(f"สำรองข้อมูลไม่สำเร็จ: {backup_status['error']}")
+    elif backup_status["last_path"]:
+        st.success(f"สำรองแล้ว: {os.path.basename(backup_status['last_path'])}")
+
+    snapshots = list_snapshots()
+    if snapshots:
+        snap_labels = {
+            s["name"]: f"{s['created_at']:%Y-%m-%d %H:%M} UTC ({s['size'] / 1024 / 1024:.1f} MB)"
+            for s in snapshots
+        }
+        snap_name = st.selectbox("Snapshot", list(snap_labels), format_func=snap_labels.get)
+        snap_path = os.path.join(BACKUP_DIR, snap_name)
+        if st.button("ตรวจสอบความสมบูรณ์"):
+            if verify_snapshot(snap_path):
+                st.success("ไฟล์สมบูรณ์ ✅")
+            else:
+                st.error("ไฟล์เสียหาย ใช้กู้คืนไม่ได้")
+        confirm_restore = st.checkbox("ยืนยันกู้คืน (เขียนทับข้อมูลปัจจุบัน)")
+        if st.button("กู้คืนจาก snapshot นี้", disabled=not confirm_restore or backup_status["running"]):
+            try:
+                result = restore_snapshot(snap_path)
+            except (ValueError, RuntimeError, OSError, sqlite3.DatabaseError) as e:
+                st.error(f"กู้คืนไม่สำเร็จ: {e}")
+            else:
+                st.session_state["restore_notice"] = (
+                    f"กู้คืนแล้ว ✅ (รูปที่กู้คืน {result['images']} ไฟล์) — "
+                    f"ข้อมูลก่อนกู้คืนอยู่ใน {os.path.basename(result['pre_restore'])}"
+                )
+                st.rerun()
+    else:
+        st.caption("ยังไม่มี snapshot")
+
 # Dashboard quick stats
 col1, col2, col3, col4 = st.columns(4)
 with col1:
@@ -583,7 +972,8 @@ for r in rows:
                 st.markdown(f"<div style='font-size:48px; line-height:1.0'>{r.get('emoji') or '🛒'}</div>", unsafe_allow_html=True)
         with top_cols[1]:
             st.markdown(f"**{r['title']}**  ")
-            st.caption(f"หมวด: {r.get('category') or 'Other'} | ความจำเป็น: {r.get('necessity')}/5 | สร้างเมื่อ: {r.get('created_at')[:10]}")
+            created = r["created_at"].strftime("%Y-%m-%d") if r.get("created_at") else "-"
+            st.caption(f"หมวด: {r.get('category') or 'Other'} | ความจำเป็น: {r.get('necessity')}/5 | สร้างเมื่อ: {created}")
             if r.get("target_date"):
                 st.caption(f"เป้าหมายภายใน: {r['target_date']}")
         with top_cols[2]:
@@ -614,7 +1004,7 @@ for r in rows:
                 with d3:
                     st.metric("priority score", f"{r['priority']:.1f}")
                 with d4:
-                    plan = savings_plan(r["price"], date.fromisoformat(r["target_date"]) if r.get("target_date") else None)
+                    plan = savings_plan(r["price"], r.get("target_date"))
                     if plan.get("has_plan"):
                         st.metric("ต้องเก็บ/เดือน", f"{plan['monthly_needed']:,.0f}")
                     else:
@@ -661,6 +1051,16 @@ for r in rows:
                     else:
                         st.error("กรอกจำนวนเงินมากกว่า 0")
 
+                st.markdown("**ประวัติการออม (90 วันล่าสุด)**")
+                history = savings_history(USER_ID, goal_id=r["id"], start=date.today() - timedelta(days=90))
+                if history:
+                    hist_df = pd.DataFrame(history, columns=["ts", "amount", "note"]).rename(
+                        columns={"ts": "เวลา (UTC)", "amount": "จำนวนเงิน", "note": "หมายเหตุ"}
+                    )
+                    st.dataframe(hist_df, hide_index=True, use_container_width=True)
+                else:
+                    st.caption("ยังไม่มีการออมในช่วงนี้")
+
         # Quick chips
         chip1, chip2, chip3 = st.columns(3)
         with chip1: